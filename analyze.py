@@ -0,0 +1,122 @@
+import argparse
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+
+import fairy
+import book
+
+defaultArmy = "Fabulous Fides"
+
+def parse(line):
+    line = line.strip()
+    if line.startswith("{"):
+        record = json.loads(line)
+        return record["fen"], record.get("white", defaultArmy), record.get("black", defaultArmy)
+    fields = line.split("\t")
+    fields += [defaultArmy] * (3 - len(fields))
+    return fields[0], fields[1], fields[2]
+
+
+compiled = {}
+
+def pieces(white, black):
+    if (white, black) not in compiled:
+        compiled[(white, black)] = {
+            **fairy.generateArmy(white, fairy.Color.white),
+            **fairy.generateArmy(black, fairy.Color.black)
+        }
+    return compiled[(white, black)]
+
+def analyseLine(line):
+    try:
+        fen, white, black = parse(line)
+        board = fairy.Board(fen, pieces = pieces(white, black))
+        board.whiteArmy = white
+        board.blackArmy = black
+        return {"fen": fen, "white": white, "black": black, **book.analyse(board)}
+    except Exception as e:
+        return {"line": line.strip(), "error": repr(e)}
+
+def analyseChunk(lines):
+    return [json.dumps(analyseLine(line)) for line in lines]
+
+def chunks(lines, size):
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Progress:
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return 0, 0
+        with open(self.path) as f:
+            state = json.load(f)
+        return state["records"], state["bytes"]
+
+    def save(self, records, nbytes):
+        with open(self.path + ".tmp", "w") as f:
+            json.dump({"records": records, "bytes": nbytes}, f)
+        os.replace(self.path + ".tmp", self.path)
+
+
+def inputLines(paths):
+    if not paths:
+        yield from sys.stdin
+    for path in paths:
+        with open(path) as f:
+            yield from f
+
+def run(args):
+    progress = Progress(args.output + ".offset")
+    done, nbytes = progress.load() if args.resume else (0, 0)
+    out = open(args.output, "r+" if done else "w")
+    out.truncate(nbytes)
+    out.seek(nbytes)
+
+    lines = itertools.islice((line for line in inputLines(args.inputs) if line.strip()), done, None)
+    start = fairy.timer()
+    report = start
+    records = 0
+    with multiprocessing.Pool(args.workers) as pool:
+        pending = collections.deque()
+        for chunk in itertools.chain(chunks(lines, args.chunksize), [None]):
+            if chunk is not None:
+                pending.append(pool.apply_async(analyseChunk, (chunk,)))
+            # results are written in input order; at most `window` chunks are in flight
+            while pending and (chunk is None or len(pending) >= args.window or pending[0].ready()):
+                results = pending.popleft().get()
+                out.write("\n".join(results) + "\n")
+                out.flush()
+                records += len(results)
+                progress.save(done + records, out.tell())
+                now = fairy.timer()
+                if now - report >= args.interval:
+                    report = now
+                    print("%d records, %.1f/s" % (done + records, records / (now - start)), file = sys.stderr)
+    out.close()
+    elapsed = fairy.timer() - start
+    print("%d records in %.1fs, %.1f/s" % (records, elapsed, records / max(elapsed, 1e-9)), file = sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description = "Legal moves, check and result for a stream of FENs.")
+    parser.add_argument("inputs", nargs = "*", help = "files of 'fen<TAB>white<TAB>black' or json lines, default stdin")
+    parser.add_argument("-o", "--output", required = True)
+    parser.add_argument("--resume", action = "store_true", help = "continue after the last finished record")
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--chunksize", type = int, default = 64)
+    parser.add_argument("--window", type = int, default = 16, help = "maximum number of chunks in flight")
+    parser.add_argument("--interval", type = float, default = 5, help = "seconds between throughput reports")
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
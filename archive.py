@@ -0,0 +1,284 @@
+import argparse
+import bisect
+import collections
+import fcntl
+import heapq
+import itertools
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import fairy
+
+# Columns are appended per game, indexes are rebuilt from them by reindex().
+# games.bin  white, black, result, move offset, hash offset, plies
+# moves.bin  one uint16 per ply, orig * 64 + dest
+# hashes.bin one uint64 position hash per position, plies + 1 per game
+# positions.idx / pairs.idx  sorted (key, game) records after an index header
+game = struct.Struct("<HHBQQI")
+ply = struct.Struct("<H")
+positionHash = struct.Struct("<Q")
+indexHeader = struct.Struct("<I")
+positionRecord = struct.Struct("<QI")
+pairRecord = struct.Struct("<HHI")
+
+results = ["", "1-0", "0-1", "½-½"]
+
+def squareIndex(name):
+    square = fairy.Square(name)
+    return square.r * 8 + square.f
+
+def squareName(index):
+    return str(fairy.Square(index % 8, index // 8))
+
+
+class Column:
+    def __init__(self, path, record):
+        self.path = path
+        self.record = record
+        self.data = None
+        if not os.path.exists(path):
+            open(path, "wb").close()
+
+    def __len__(self):
+        return os.path.getsize(self.path) // self.record.size
+
+    def refresh(self):
+        # remap when other processes have appended since the last look
+        size = os.path.getsize(self.path)
+        if size and (self.data is None or len(self.data) != size):
+            with open(self.path, "rb") as f:
+                self.data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+
+    def mapped(self):
+        return 0 if self.data is None else len(self.data) // self.record.size
+
+    def __getitem__(self, i):
+        return self.record.unpack_from(self.data, i * self.record.size)
+
+    def slice(self, start, stop):
+        if self.data is None:
+            return iter(())
+        return self.record.iter_unpack(self.data[start * self.record.size:stop * self.record.size])
+
+    def append(self, records):
+        with open(self.path, "ab") as f:
+            f.write(b"".join(self.record.pack(*r) for r in records))
+
+
+class Index:
+    def __init__(self, path, record):
+        self.path = path
+        self.record = record
+        self.data = None
+        self.n = 0
+        self.indexed = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                self.data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+            self.indexed = indexHeader.unpack_from(self.data, 0)[0]
+            self.n = (len(self.data) - indexHeader.size) // record.size
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return self.record.unpack_from(self.data, indexHeader.size + i * self.record.size)
+
+    def lookup(self, key):
+        keys = KeyView(self, len(key))
+        lo = bisect.bisect_left(keys, key)
+        hi = bisect.bisect_right(keys, key)
+        return [self[i][-1] for i in range(lo, hi)]
+
+    @staticmethod
+    def write(path, record, records, indexed):
+        # records arrive sorted, repeats of a position within a game are dropped
+        with open(path + ".tmp", "wb") as f:
+            f.write(indexHeader.pack(indexed))
+            for r, _ in itertools.groupby(records):
+                f.write(record.pack(*r))
+        os.replace(path + ".tmp", path)
+
+def externalSort(records, record, directory, chunk = 1 << 20):
+    # sorted runs of at most `chunk` records are spooled to temporary files
+    # and merged, so memory stays bounded however large the archive is
+    runs = []
+    while True:
+        block = sorted(itertools.islice(records, chunk))
+        if not block:
+            break
+        run = tempfile.TemporaryFile(dir = directory)
+        run.write(b"".join(record.pack(*r) for r in block))
+        run.seek(0)
+        runs.append(run)
+    return heapq.merge(*(readRun(run, record) for run in runs))
+
+def readRun(run, record, block = 4096):
+    with run:
+        while True:
+            data = run.read(record.size * block)
+            if not data:
+                return
+            yield from record.iter_unpack(data)
+
+class KeyView:
+    def __init__(self, index, width):
+        self.index = index
+        self.width = width
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        return self.index[i][:self.width]
+
+
+class Archive:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok = True)
+        self.games = Column(self.file("games.bin"), game)
+        self.moves = Column(self.file("moves.bin"), ply)
+        self.hashes = Column(self.file("hashes.bin"), positionHash)
+        self.load()
+
+    def file(self, name):
+        return os.path.join(self.directory, name)
+
+    def refresh(self):
+        # games last: a game that is visible has its moves and hashes mapped
+        self.moves.refresh()
+        self.hashes.refresh()
+        self.games.refresh()
+
+    def load(self):
+        self.loadArmies()
+        self.positions = Index(self.file("positions.idx"), positionRecord)
+        self.pairs = Index(self.file("pairs.idx"), pairRecord)
+
+    def loadArmies(self):
+        path = self.file("armies.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                self.armies = json.load(f)
+        else:
+            self.armies = []
+
+    def armyId(self, name):
+        if name not in self.armies:
+            self.armies.append(name)
+            with open(self.file("armies.json") + ".tmp", "w") as f:
+                json.dump(self.armies, f)
+            os.replace(self.file("armies.json") + ".tmp", self.file("armies.json"))
+        return self.armies.index(name)
+
+    def add(self, board):
+        plies = board.halfmove
+        moves = [(squareIndex(m[:2]) * 64 + squareIndex(m[2:]),) for m in board.moves[:plies]]
+        hashes = [(h,) for h in board.hashes[:plies + 1]]
+        with open(self.file("lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.loadArmies()
+            white = self.armyId(board.whiteArmy)
+            black = self.armyId(board.blackArmy)
+            gameId = len(self.games)
+            moveOffset = len(self.moves)
+            hashOffset = len(self.hashes)
+            # the game record goes last, readers only see complete games
+            self.moves.append(moves)
+            self.hashes.append(hashes)
+            self.games.append([(white, black, results.index(board.result()), moveOffset, hashOffset, plies)])
+        return gameId
+
+    def game(self, gameId):
+        if gameId >= self.games.mapped():
+            self.refresh()
+        white, black, result, moveOffset, hashOffset, plies = self.games[gameId]
+        if max(white, black) >= len(self.armies):
+            self.loadArmies()
+        return {
+            "id": gameId,
+            "white": self.armies[white],
+            "black": self.armies[black],
+            "result": results[result],
+            "moves": [squareName(m // 64) + squareName(m % 64) for m, in self.moves.slice(moveOffset, moveOffset + plies)]
+        }
+
+    def __len__(self):
+        return len(self.games)
+
+    def __iter__(self):
+        self.refresh()
+        return (self.game(i) for i in range(self.games.mapped()))
+
+    def gamesWithPosition(self, h):
+        self.refresh()
+        found = self.positions.lookup((h,))
+        # games added since the last reindex are scanned directly
+        for gameId in range(self.positions.indexed, self.games.mapped()):
+            _, _, _, _, hashOffset, plies = self.games[gameId]
+            if any(x == h for x, in self.hashes.slice(hashOffset, hashOffset + plies + 1)):
+                found.append(gameId)
+        return sorted(set(found))
+
+    def gamesForPair(self, white, black):
+        self.loadArmies()
+        if white not in self.armies or black not in self.armies:
+            return []
+        key = (self.armies.index(white), self.armies.index(black))
+        self.refresh()
+        found = self.pairs.lookup(key)
+        for gameId in range(self.pairs.indexed, self.games.mapped()):
+            if self.games[gameId][:2] == key:
+                found.append(gameId)
+        return found
+
+    def results(self, white, black):
+        return collections.Counter(results[self.games[g][2]] or "*" for g in self.gamesForPair(white, black))
+
+    def positionRecords(self, n):
+        for gameId, (_, _, _, _, hashOffset, plies) in enumerate(self.games.slice(0, n)):
+            for h, in self.hashes.slice(hashOffset, hashOffset + plies + 1):
+                yield h, gameId
+
+    def pairRecords(self, n):
+        for gameId, (white, black, _, _, _, _) in enumerate(self.games.slice(0, n)):
+            yield white, black, gameId
+
+    def reindex(self):
+        self.refresh()
+        n = self.games.mapped()
+        Index.write(self.file("positions.idx"), positionRecord,
+                    externalSort(self.positionRecords(n), positionRecord, self.directory), n)
+        Index.write(self.file("pairs.idx"), pairRecord,
+                    externalSort(self.pairRecords(n), pairRecord, self.directory), n)
+        self.load()
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Query the archive of finished games.")
+    parser.add_argument("directory")
+    parser.add_argument("command", choices = ["index", "position", "pair"])
+    parser.add_argument("args", nargs = "*", help = "white and black army and a fen for position, white and black army for pair")
+    args = parser.parse_args()
+
+    archive = Archive(args.directory)
+    start = fairy.timer()
+    if args.command == "index":
+        archive.reindex()
+        print(len(archive), "games indexed")
+    elif args.command == "position":
+        # the pieces decide which castlings the fen's position allows
+        board = fairy.Board.fromArmy(args.args[0], args.args[1])
+        board.loadFen(" ".join(args.args[2:]))
+        for gameId in archive.gamesWithPosition(board.positionHash()):
+            print(json.dumps(archive.game(gameId)))
+    elif args.command == "pair":
+        print(dict(archive.results(*args.args)))
+    print("%.1f ms" % (1000 * (fairy.timer() - start)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import collections
+import hashlib
+import itertools
+import json
+import mmap
+import multiprocessing
+import random
+import struct
+
+import fairy
+import archive
+
+# File layout: header (magic, record count, plies the book was built for),
+# records sorted by key, then the json payloads.
+# Records are fixed size so lookups are a binary search over the mapping.
+MAGIC = b"NCBOOK03"
+header = struct.Struct("<8sQQ")
+record = struct.Struct("<QQI")
+
+def bookKey(whiteArmy, blackArmy, positionHash):
+    h = hashlib.blake2b(digest_size = 8)
+    h.update((whiteArmy + "\0" + blackArmy + "\0").encode())
+    h.update(positionHash.to_bytes(8, "little"))
+    return int.from_bytes(h.digest(), "little")
+
+def analyse(board):
+    return {
+        "dests": board.generateMoveDict(),
+        "check": board.isCheck(board.activeColor.opp()),
+        "result": board.result()
+    }
+
+
+class OpeningBook:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, self.n, self.plies = header.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(path + " is not an opening book")
+
+    def __len__(self):
+        return self.n
+
+    def key(self, i):
+        return struct.unpack_from("<Q", self.data, header.size + i * record.size)[0]
+
+    def find(self, key):
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n and self.key(lo) == key:
+            _, offset, length = record.unpack_from(self.data, header.size + lo * record.size)
+            return json.loads(self.data[offset:offset + length])
+        return None
+
+    def lookup(self, board):
+        entry = self.find(bookKey(board.whiteArmy, board.blackArmy, board.positionHash()))
+        if entry is None or entry["position"] != board.positionKey():
+            return None
+        return entry
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+def selfplay(white, black, plies, rng = random):
+    board = fairy.Board.fromArmy(white, black)
+    moves = []
+    for _ in range(plies):
+        legal = list(board.generateMoves())
+        if not legal:
+            break
+        move = rng.choice(legal)
+        moves.append(str(move.orig) + str(move.dest))
+        board.execute(move)
+    return {"white": white, "black": black, "moves": moves}
+
+def readGames(path):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def collect(games, plies):
+    entries = {}
+    for game in games:
+        board = fairy.Board.fromArmy(game["white"], game["black"])
+        for move in game["moves"][:plies]:
+            key = bookKey(board.whiteArmy, board.blackArmy, board.positionHash())
+            if key not in entries:
+                entries[key] = {"position": board.positionKey(), **analyse(board), "moves": collections.Counter()}
+            entries[key]["moves"][move] += 1
+            if board.makeMove(move[:2], move[2:]) is None:
+                break
+    return entries
+
+def collectSelfplay(args):
+    white, black, ngames, plies, seed = args
+    rng = random.Random(seed)
+    return collect((selfplay(white, black, plies, rng) for _ in range(ngames)), plies)
+
+def merge(entries, more):
+    for key, entry in more.items():
+        if key in entries:
+            entries[key]["moves"].update(entry["moves"])
+        else:
+            entries[key] = entry
+    return entries
+
+def write(path, entries, plies):
+    keys = sorted(entries)
+    payloads = []
+    for key in keys:
+        entry = entries[key]
+        entry["moves"] = entry["moves"].most_common()
+        payloads.append(json.dumps(entry, separators = (",", ":")).encode())
+    with open(path, "wb") as f:
+        f.write(header.pack(MAGIC, len(keys), plies))
+        offset = header.size + len(keys) * record.size
+        for key, payload in zip(keys, payloads):
+            f.write(record.pack(key, offset, len(payload)))
+            offset += len(payload)
+        for payload in payloads:
+            f.write(payload)
+
+def main():
+    parser = argparse.ArgumentParser(description = "Build an opening book for every army pair.")
+    parser.add_argument("output")
+    parser.add_argument("--plies", type = int, default = 8)
+    parser.add_argument("--selfplay", type = int, default = 0, help = "random games per army pair")
+    parser.add_argument("--games", action = "append", default = [], help = "jsonl file of {white, black, moves}")
+    parser.add_argument("--archive", action = "append", default = [], help = "game archive directory")
+    parser.add_argument("--armies", nargs = "*", default = list(fairy.armies.keys()))
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    entries = {}
+    for path in args.games:
+        merge(entries, collect(readGames(path), args.plies))
+    for directory in args.archive:
+        merge(entries, collect(archive.Archive(directory), args.plies))
+    if args.selfplay > 0:
+        jobs = [(w, b, args.selfplay, args.plies, "%d/%s/%s" % (args.seed, w, b))
+                for w, b in itertools.product(args.armies, repeat = 2)]
+        with multiprocessing.Pool(args.workers) as pool:
+            for more in pool.imap_unordered(collectSelfplay, jobs):
+                merge(entries, more)
+    write(args.output, entries, args.plies)
+    print(len(entries), "positions written to", args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import json
+import os
+import signal
+import socket
+import tempfile
+import zlib
+
+import gevent
+from gevent.server import StreamServer
+
+from geventwebsocket import WebSocketServer
+
+def roomName(path):
+    return path[len("/websocket"):].strip("/")
+
+def owner(room, nworkers):
+    # crc32 rather than hash() so every process agrees on the worker
+    return zlib.crc32(room.encode()) % nworkers
+
+def requestPath(sock, attempts = 50):
+    # the request line can arrive in several segments: peek until it is
+    # complete, a peek returns at once once anything is buffered
+    head = b""
+    for _ in range(attempts):
+        try:
+            head = sock.recv(2048, socket.MSG_PEEK)
+        except OSError:
+            return None
+        if not head or b"\r\n" in head or len(head) >= 2048:
+            break
+        gevent.sleep(0.1)
+    if b"\r\n" not in head:
+        return None
+    line = head.split(b"\r\n", 1)[0].split()
+    if len(line) < 2:
+        return None
+    return line[1].decode("latin-1").split("?")[0]
+
+def connect(path, retries = 50):
+    for _ in range(retries):
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(path)
+            return sock
+        except OSError:
+            sock.close()
+            gevent.sleep(0.1)
+    raise ConnectionError("could not connect to " + path)
+
+
+class Lobby:
+    def __init__(self, path = None):
+        self.state = {}
+        self.sock = None
+        if path is not None:
+            self.sock = connect(path)
+            gevent.spawn(self.listen)
+
+    def publish(self, topic, key, value):
+        self.update(topic, key, value)
+        if self.sock is not None:
+            self.sock.sendall(json.dumps({"topic": topic, "key": key, "value": value}).encode() + b"\n")
+
+    def update(self, topic, key, value):
+        entries = self.state.setdefault(topic, {})
+        if value is None:
+            entries.pop(key, None)
+        else:
+            entries[key] = value
+
+    def get(self, topic):
+        return self.state.get(topic, {})
+
+    def listen(self):
+        for line in self.sock.makefile("rb"):
+            message = json.loads(line)
+            self.update(message["topic"], message["key"], message["value"])
+
+
+class LobbyBroker:
+    def __init__(self, path):
+        self.state = {}
+        self.connections = set()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(128)
+        self.server = StreamServer(self.sock, self.handle)
+
+    def handle(self, sock, address):
+        for line in self.state.values():
+            sock.sendall(line)
+        self.connections.add(sock)
+        try:
+            for line in sock.makefile("rb"):
+                message = json.loads(line)
+                self.state[(message["topic"], message["key"])] = line
+                for other in list(self.connections):
+                    if other is not sock:
+                        try:
+                            other.sendall(line)
+                        except OSError:
+                            self.connections.discard(other)
+        finally:
+            self.connections.discard(sock)
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+
+class RoutingServer(WebSocketServer):
+    # All workers accept on the same socket. A websocket whose room belongs
+    # to another worker is passed on as a file descriptor over a unix socket.
+    def __init__(self, listener, application, worker, nworkers, rundir, **kwargs):
+        super().__init__(listener, application, **kwargs)
+        self.worker = worker
+        self.nworkers = nworkers
+        self.rundir = rundir
+        self.peers = {}
+        handoff = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        handoff.bind(self.handoffPath(worker))
+        handoff.listen(128)
+        self.handoff = StreamServer(handoff, self.receive)
+        self.handoff.start()
+
+    def handoffPath(self, worker):
+        return os.path.join(self.rundir, "worker%d.sock" % worker)
+
+    def handle(self, sock, address):
+        path = requestPath(sock)
+        if path is None:
+            sock.close()
+            return
+        if path.startswith("/websocket"):
+            target = owner(roomName(path), self.nworkers)
+            if target != self.worker:
+                self.forward(target, sock)
+                return
+        super().handle(sock, address)
+
+    def forward(self, target, sock):
+        if target not in self.peers:
+            self.peers[target] = connect(self.handoffPath(target))
+        socket.send_fds(self.peers[target], [b"\0"], [sock.fileno()])
+        sock.close()
+
+    def receive(self, channel, address):
+        while True:
+            _, fds, _, _ = socket.recv_fds(channel, 1, 1)
+            if not fds:
+                return
+            sock = socket.socket(fileno = fds[0])
+            gevent.spawn(super().handle, sock, sock.getpeername())
+
+
+def supervise(address, nworkers, application, **kwargs):
+    rundir = tempfile.mkdtemp(prefix = "notchess-")
+    lobbyPath = os.path.join(rundir, "lobby.sock")
+    broker = LobbyBroker(lobbyPath)
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(address)
+    listener.listen(1024)
+
+    children = []
+    for worker in range(nworkers):
+        pid = os.fork()
+        if pid == 0:
+            broker.sock.close()
+            RoutingServer(listener, application(Lobby(lobbyPath)), worker, nworkers, rundir, debug = False, **kwargs).serve_forever()
+            os._exit(0)
+        children.append(pid)
+
+    try:
+        broker.serve_forever()
+    finally:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
@@ -0,0 +1,159 @@
+import argparse
+import collections
+import itertools
+import random
+
+import baseline
+import fairy
+
+
+class ReferenceBoard(baseline.Board):
+    # Backends are checked against the frozen baseline. Only the choice
+    # between moves with the same squares is made here: the baseline
+    # played requests it could not match without validating them.
+    def choose(self, orig, dest):
+        orig = baseline.Square(orig)
+        dest = baseline.Square(dest)
+        best = None
+        for move in self.generateMoves(orig = orig):
+            if move.orig == orig and move.dest == dest:
+                if best is None or len(move.sideeffects) >= len(best.sideeffects) and (move.capture or not best.capture):
+                    best = move
+        return best
+
+    def makeMove(self, orig, dest):
+        best = self.choose(orig, dest)
+        if best is None:
+            best = baseline.Move(baseline.Square(orig), baseline.Square(dest))
+        self.execute(best)
+        return best
+
+
+# A backend is a factory (white, black) -> board. The board needs
+# generateMoves(), legalMoves() keyed by (orig, dest), makeMove() and result().
+backends = {}
+
+def register(name, factory):
+    backends[name] = factory
+
+register("fairy", fairy.Board.fromArmy)
+
+
+def signature(move):
+    return (
+        str(move.orig),
+        str(move.dest),
+        tuple(sorted(str(s) for s in move.captures())),
+        tuple(str(s) for s in move.path),
+        tuple(signature(m) for m in move.sideeffects),
+        move.isfree
+    )
+
+def compare(reference, board):
+    expected = collections.Counter(signature(m) for m in reference.generateMoves())
+    actual = collections.Counter(signature(m) for m in board.generateMoves())
+    if expected != actual:
+        return "legal moves differ: missing %s, extra %s" % (list(expected - actual), list(actual - expected))
+    for (orig, dest), move in board.legalMoves().items():
+        # the origin scan misses moves generated on behalf of another piece
+        # (support), those have no reference choice to compare against
+        expected = reference.choose(orig, dest)
+        if expected is not None and signature(expected) != signature(move):
+            return "makeMove picks a different move for %s%s" % (orig, dest)
+    if reference.result() != board.result():
+        return "result %r, expected %r" % (board.result(), reference.result())
+    return None
+
+
+class Case:
+    def __init__(self, white, black, moves, removed = ()):
+        self.white = white
+        self.black = black
+        self.moves = list(moves)
+        self.removed = list(removed)
+
+    def replay(self, factory):
+        board = factory(self.white, self.black)
+        for orig, dest in self.moves:
+            board.makeMove(orig, dest)
+        for square in self.removed:
+            square = fairy.Square(square)
+            board[square] = type(board[square]).empty()
+        return board
+
+    def check(self, backend):
+        reference = self.replay(ReferenceBoard.fromArmy)
+        board = self.replay(backends[backend])
+        try:
+            return compare(reference, board)
+        except Exception as e:
+            return repr(e)
+
+    def __str__(self):
+        reference = self.replay(ReferenceBoard.fromArmy)
+        return "%s vs %s, moves %s, removed %s\n%s" % (self.white, self.black,
+            " ".join(o + d for o, d in self.moves), self.removed, reference.getFen())
+
+def shrink(case, backend):
+    # the playout is checked ply by ply, so the move prefix is already minimal;
+    # drop pieces while the failure persists
+    for square, piece in case.replay(ReferenceBoard.fromArmy):
+        if not piece.isempty() and not piece.isking:
+            smaller = Case(case.white, case.black, case.moves, case.removed + [str(square)])
+            if smaller.check(backend) is not None:
+                case = smaller
+    return case
+
+def playout(white, black, plies, backend, rng, timings):
+    reference = ReferenceBoard.fromArmy(white, black)
+    board = backends[backend](white, black)
+    moves = []
+    for _ in range(plies):
+        start = fairy.timer()
+        legal = list(reference.generateMoves())
+        reference.result()
+        timings[white][0] += fairy.timer() - start
+        start = fairy.timer()
+        board.legalMoves()
+        board.result()
+        timings[white][1] += fairy.timer() - start
+
+        failure = compare(reference, board)
+        if failure is not None:
+            return Case(white, black, moves), failure
+        if not legal:
+            break
+        move = rng.choice(legal)
+        moves.append((str(move.orig), str(move.dest)))
+        reference.makeMove(*moves[-1])
+        board.makeMove(*moves[-1])
+    return None, None
+
+def main():
+    parser = argparse.ArgumentParser(description = "Compare move generation backends against the reference board.")
+    parser.add_argument("--backend", default = "fairy", choices = sorted(backends))
+    parser.add_argument("--armies", nargs = "*", default = list(fairy.armies.keys()))
+    parser.add_argument("--games", type = int, default = 1, help = "random games per army pair")
+    parser.add_argument("--plies", type = int, default = 40)
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    timings = collections.defaultdict(lambda: [0.0, 0.0])
+    failures = 0
+    for white, black in itertools.product(args.armies, repeat = 2):
+        for _ in range(args.games):
+            case, failure = playout(white, black, args.plies, args.backend, rng, timings)
+            if case is not None:
+                failures += 1
+                print("FAIL", failure)
+                print(shrink(case, args.backend))
+
+    print("%-24s %10s %10s %8s" % ("army", "reference", args.backend, "speedup"))
+    for army, (ref, new) in sorted(timings.items()):
+        print("%-24s %9.2fs %9.2fs %7.2fx" % (army, ref, new, ref / max(new, 1e-9)))
+    print(failures, "failures")
+    return failures
+
+if __name__ == "__main__":
+    raise SystemExit(main() > 0)
@@ -1,4 +1,5 @@
 import collections
+import hashlib
 import itertools
 from copy import copy, deepcopy
 from enum import Enum
@@ -8,6 +9,7 @@ import random
 from timeit import default_timer as timer
 
 startingFen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+pieceOrder = "KQRBNP"
 
 def symmetrize(offset, offset2 = None):
     if offset2 is None:
@@ -45,6 +47,10 @@ def distance(sq1, sq2):
 def epoffset(color):
     return (0, -1) if color == Color.white else (0, 1)
 
+def fenHash(fen):
+    key = " ".join(fen.split()[:4])
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size = 8).digest(), "little")
+
 class Color(Enum):
     white = "w"
     black = "b"
@@ -164,14 +170,14 @@ class MoveGen:
                         if enpassant and board.epsquare == capture:
                             epoffset = (0, -1) if self.color == Color.white else (0, 1)
                             captures.append(capture + epoffset)
-                            yield Move(orig, dest, capture = captures)
+                            yield Move(orig, dest, capture = list(captures))
                         else:
                             break
                     if translate and board[capture].color == self.color:
-                        yield Move(orig, dest, capture = captures)
+                        yield Move(orig, dest, capture = list(captures))
                     if attack and board[capture].color == self.color.opp():
                         captures.append(capture)
-                        yield Move(orig, dest, capture = captures)
+                        yield Move(orig, dest, capture = list(captures))
                     capture = dest + offset
                     dest = capture + (offset[0] // gcd, offset[1] // gcd)
                     if not chain:
@@ -198,7 +204,7 @@ class MoveGen:
             if nrec > 0:
                 return
             if self.nmoves == 0:
-                for square in board.squares():
+                for square in board.pieceSquares(self.color):
                     target = board[square]
                     if target.name.upper() in name.upper() and target.color == self.color:
                         if target.nmoves == 0:
@@ -215,7 +221,7 @@ class MoveGen:
     @staticmethod
     def powercastle(name = "RNBQP"):
         def generator(self, orig, board, nrec = 0):
-            for square in board.squares():
+            for square in board.pieceSquares(self.color):
                 target = board[square]
                 if target.name.upper() in name.upper() and target.color == self.color and square != orig:
                     offset = square - orig
@@ -243,7 +249,7 @@ class MoveGen:
     @staticmethod
     def swap(name):
         def generator(self, orig, board, nrec = 0):
-            for dest in board.squares():
+            for dest in board.pieceSquares(self.color):
                 target = board[dest]
                 if target.name.upper() == name.upper() and target.color == self.color and not target.name == self.name:
                     yield Move(orig, dest, sideeffects = Move(dest, orig, isfree = True))
@@ -264,7 +270,7 @@ class MoveGen:
     @staticmethod
     def support(d, gen, name = "RNBQKP"):
         def generator(self, orig, board, nrec = 0):
-            for square in board.squares():
+            for square in board.pieceSquares(self.color):
                 if board[square].color == self.color and distance(square, orig) <= d and square != orig and board[square].name.upper() in name:
                     yield from gen(board[square], square, board)
         return generator
@@ -285,7 +291,7 @@ class MoveGen:
     def inverseCapture(gen):
         def generator(self, orig, board, nrec = 0):
             if nrec == 0:
-                for square in board.squares():
+                for square in board.pieceSquares(self.color.opp()):
                     if board[square].color == self.color.opp():
                         flag = False
                         for g in board[square].moveGenerators:
@@ -584,8 +590,15 @@ class Move:
 
 
 class Board:
+    tablebases = {}
+
     def __init__(self, fen = startingFen, pieces = Piece.defaults()):
         self.board = [[Piece.empty() for i in range(8)] for j in range(8)]
+        self.attackMaps = {}
+        self.moveIndex = None
+        self.moveCache = {}
+        self.reads = None
+        self.dirty = set()
         self.activeColor = Color.white
         self.castling = {Color.white: [True, True], Color.black: [True, True]}
         self.epsquare = None
@@ -597,6 +610,8 @@ class Board:
         self.whiteArmy = "Fabulous Fides"
         self.blackArmy = "Fabulous Fides"
         self.history = [self.getFen()]
+        self.hashes = [self.positionHash()]
+        self.moves = []
     
     @classmethod
     def fromArmy(cls, white = None, black = None):
@@ -616,13 +631,32 @@ class Board:
         return board
   
     def __getitem__(self, square: Square):
+        if self.reads is not None:
+            self.reads.add((square.f, square.r))
         if self.inbounds(square):
             return self.board[square.r][square.f]
         return Piece.wall()
 
     def __setitem__(self, square: Square, value: Piece):
         if self.inbounds(square):
+            self.dirty.add(("pieces", self.board[square.r][square.f].color))
+            self.dirty.add(("pieces", value.color))
+            self.dirty.add((square.f, square.r))
             self.board[square.r][square.f] = value
+            self.attackMaps = {}
+            self.moveIndex = None
+
+    @property
+    def epsquare(self):
+        if self.reads is not None:
+            self.reads.add("ep")
+        return self._epsquare
+
+    @epsquare.setter
+    def epsquare(self, square):
+        if square != self.__dict__.get("_epsquare"):
+            self.dirty.add("ep")
+        self._epsquare = square
 
     def inbounds(self, square):
         if square.r < 0 or square.r > 7 or square.f < 0 or square.f > 7:
@@ -640,52 +674,130 @@ class Board:
     def generateMoves(self, color = None, orig = None):
         if color is None:
             color = self.activeColor
+        # the opponent's lists of this position are shared with every trial
+        # board below, which only regenerates the pieces a move disturbs
+        self.syncMoves()
+        for square in self.pieceSquares(color.opp()):
+            self.pieceEntry(square)
         for move in self.generatePseudolegalMoves(color = color, orig = orig):
             for square in move.path:
-                c = deepcopy(self)
+                c = self.trial()
                 c[square] = c[move.orig]
                 if square != move.orig:
                     c[move.orig] = Piece.empty()
                 if c.isCheck(color = color.opp()):
                     break
             else:
-                after = self.after(move)
-                after.isCheck()
-                if not after.isCheck():
+                if not self.trial(move).isCheck():
                     yield move
 
-
     def generatePseudolegalMoves(self, color = None, orig = None):
         if color is None:
             color = self.activeColor
-        for square in self.squares() if orig is None else [orig]:
-            if self[square].color == color:
-                yield from self[square].generateMoves(square, self)
+        if orig is not None:
+            if self[orig].color == color:
+                yield from self.pieceMoves(orig)
+            return
+        for square in self.pieceSquares(color):
+            yield from self.pieceMoves(square)
+
+    def pieceSquares(self, color):
+        if self.reads is not None:
+            self.reads.add(("pieces", color))
+        return [Square(f, r) for f in range(8) for r in range(8) if self.board[r][f].color == color]
+
+    def pieceMoves(self, square):
+        return self.pieceEntry(square)[0]
+
+    def pieceEntry(self, square):
+        self.syncMoves()
+        key = (square.f, square.r)
+        if key not in self.moveCache:
+            piece = self[square]
+            # record every square the generators look at, so the list can
+            # be kept until one of them changes
+            self.reads = set()
+            moves = list(piece.generateMoves(square, self))
+            attacks = set((s.f, s.r) for move in moves for s in move.captures())
+            self.moveCache[key] = (moves, self.reads, attacks)
+            self.reads = None
+        return self.moveCache[key]
+
+    def syncMoves(self):
+        if self.dirty:
+            dirty = self.dirty
+            self.moveCache = {key: entry for key, entry in self.moveCache.items()
+                              if key not in dirty and entry[1].isdisjoint(dirty)}
+            self.dirty = set()
+
+    def trial(self, move = None):
+        # a copy for legality tests: it shares the pieces and the move cache
+        # with this board, copies only the pieces the move changes and keeps
+        # no history
+        c = self.__class__.__new__(self.__class__)
+        c.__dict__.update(self.__dict__)
+        c.board = [row[:] for row in self.board]
+        c.attackMaps = {}
+        c.moveIndex = None
+        c.moveCache = dict(self.moveCache)
+        c.dirty = set(self.dirty)
+        c.history = None
+        c.hashes = None
+        c.moves = None
+        if move is not None:
+            moved = [move]
+            while moved:
+                m = moved.pop()
+                if c.inbounds(m.orig):
+                    c.board[m.orig.r][m.orig.f] = deepcopy(c.board[m.orig.r][m.orig.f])
+                moved += m.sideeffects
+            c.execute(move)
+        return c
+
+    def legalMoves(self):
+        if self.moveIndex is None:
+            index = {}
+            for move in self.generateMoves():
+                key = (str(move.orig), str(move.dest))
+                best = index.get(key)
+                # prefer the move with more side effects, then captures
+                if best is None or len(move.sideeffects) >= len(best.sideeffects) and (move.capture or not best.capture):
+                    index[key] = move
+            self.moveIndex = index
+        return self.moveIndex
 
     def generateMoveDict(self):
         dests = collections.defaultdict(list)
-        for move in self.generateMoves():
-            dests[str(move.orig)].append(str(move.dest))
+        for orig, dest in self.legalMoves():
+            dests[orig].append(dest)
         return dests
 
     def isattacked(self, square, color = None):
         if color is None:
             color = self.activeColor
-        for move in self.generatePseudolegalMoves(color):
-            if any(dest == square for dest in move.captures()):
-                return True
-        return False
+        key = (square.f, square.r)
+        return any(key in self.pieceEntry(orig)[2] for orig in self.pieceSquares(color))
+
+    def attackMap(self, color = None):
+        if color is None:
+            color = self.activeColor
+        if color not in self.attackMaps:
+            attackers = collections.defaultdict(list)
+            for move in self.generatePseudolegalMoves(color):
+                for square in move.captures():
+                    attackers[str(square)].append(move.orig)
+            self.attackMaps[color] = attackers
+        return self.attackMaps[color]
 
     def makeMove(self, orig, dest):
-        orig = Square(orig)
-        dest = Square(dest)
-        best = Move(orig, dest)
-        for move in self.generateMoves(orig = orig):
-            if move.orig == orig and move.dest == dest and len(move.sideeffects) >= len(best.sideeffects):
-                if move.capture or not best.capture:
-                    best = move
-        self.execute(best)
-        return best
+        # the index is keyed by square names, anything else is not a move
+        if type(orig) is not str or type(dest) is not str:
+            return None
+        move = self.legalMoves().get((orig, dest))
+        if move is None:
+            return None
+        self.execute(move)
+        return move
 
     def execute(self, move):
         piece = self[move.orig]
@@ -709,7 +821,10 @@ class Board:
             if self.activeColor == "b":
                 self.move += 1
             self.activeColor = self.activeColor.opp()
-            self.pushHistory()
+            self.attackMaps = {}
+            self.moveIndex = None
+            if self.history is not None:
+                self.pushHistory(move)
         
 
     def goto(self, halfmove):
@@ -723,10 +838,28 @@ class Board:
     def redo(self, n = 1):
         self.undo(-n)
 
-    def pushHistory(self):
+    def pushHistory(self, move = None):
         if self.halfmove < len(self.history):
             self.history = self.history[0:self.halfmove]
+            self.hashes = self.hashes[0:self.halfmove]
+            self.moves = self.moves[0:self.halfmove - 1]
         self.history.append(self.getFen())
+        # the fen forgets which kings and rooks have moved, keep the key
+        # the book and the archive look positions up by
+        self.hashes.append(self.positionHash())
+        self.moves.append(str(move.orig) + str(move.dest) if move else "")
+
+    def __deepcopy__(self, memo):
+        c = self.__class__.__new__(self.__class__)
+        memo[id(self)] = c
+        transient = ["attackMaps", "moveIndex", "moveCache", "reads", "dirty"]
+        c.__dict__.update({k: deepcopy(v, memo) for k, v in self.__dict__.items() if k not in transient})
+        c.attackMaps = {}
+        c.moveIndex = None
+        c.moveCache = {}
+        c.reads = None
+        c.dirty = set()
+        return c
 
     def after(self, move):
         c = deepcopy(self)
@@ -736,21 +869,28 @@ class Board:
     def isCheck(self, color = None):
         if color is None:
             color = self.activeColor
-        for sq in self.squares():
-            if self[sq].color == color.opp() and self[sq].isking:
-                if self.isattacked(sq, color):
-                    return True
+        for sq in self.pieceSquares(color.opp()):
+            if self[sq].isking and self.isattacked(sq, color):
+                return True
         return False
     
     def result(self):
-        for _ in self.generateMoves(self.activeColor):
-            break
-        else:
+        if not self.legalMoves():
             if self.isCheck(self.activeColor.opp()):
                 return "1-0" if self.activeColor == Color.black else "0-1"
             return "½-½"
         return ""
 
+    def material(self):
+        names = sorted((str(piece) for _, piece in self if not piece.isempty()), key = lambda n: pieceOrder.index(n.upper()))
+        return "".join(n for n in names if n.isupper()), "".join(n for n in names if n.islower())
+
+    def probe(self):
+        table = Board.tablebases.get((self.whiteArmy, self.blackArmy) + self.material())
+        if table is None:
+            return None
+        return table.probe(self)
+
     def loadFen(self, fen):
         position, active, castling, enpassant, halfmove, move = fen.split()
 
@@ -769,6 +909,8 @@ class Board:
         self.epsquare = (Square(enpassant) if enpassant in Square.names else None)
         self.halfmove = int(halfmove)
         self.move = int(move)
+        self.attackMaps = {}
+        self.moveIndex = None
 
     def getFen(self):
         rows = [8 * [" "] for i in range(8)]
@@ -787,10 +929,25 @@ class Board:
 
         return " ".join([position, active, castling, enpassant, halfmove, move])
 
+    def castlingKey(self):
+        # the fen castling field is never updated, castle() looks at nmoves:
+        # list the unmoved kings and rooks of every side whose king is unmoved
+        unmoved = [(square, piece) for square, piece in self if piece.nmoves == 0 and (piece.isking or piece.name.upper() == "R")]
+        colors = set(piece.color for _, piece in unmoved if piece.isking)
+        return "".join(str(piece) + str(square) for square, piece in unmoved if piece.color in colors) or "-"
+
+    def positionKey(self):
+        fields = self.getFen().split()
+        return " ".join([fields[0], fields[1], self.castlingKey(), fields[3]])
+
+    def positionHash(self):
+        return fenHash(self.positionKey())
+
     def kriegspielFen(self, color):
+        attacked = self.attackMap(color)
         rows = [8 * [" "] for i in range(8)]
         for square in self.squares():
-            if self.isattacked(square, color) or self[square].color == color:
+            if str(square) in attacked or self[square].color == color:
                 rows[square.r][square.f] = str(self[square])
         position = "/".join(reversed(["".join(r) for r in rows]))
         for i in range(8, 0, -1):
@@ -1,118 +1,489 @@
+import argparse
+import collections
+import functools
+import gzip
 import json
+import logging
+import mimetypes
+import os
+import socket
+import sys
 from collections.abc import Iterable
 
 from gevent import monkey
 monkey.patch_all()
 
-from flask import Flask, render_template
+import gevent
+from gevent.event import Event
+from gevent.lock import BoundedSemaphore
+
+from flask import Flask, render_template, request, send_from_directory
 from flask_assets import Environment, Bundle
 from werkzeug.debug import DebuggedApplication
 
 from geventwebsocket import WebSocketServer, WebSocketApplication, Resource
+from geventwebsocket.exceptions import WebSocketError
+from geventwebsocket.handler import WebSocketHandler
+from geventwebsocket.websocket import WebSocket
 
 flask_app = Flask(__name__)
 flask_app.debug = True
 assets = Environment(flask_app)
 assets.debug = True
+assets.versions = "hash"
+assets.manifest = "json:gen/manifest.json"
+assets.url_expire = False
+
+bundles = {
+    "js": Bundle("lib/chessground.js", filters = "rjsmin", output = "gen/packed.%(version)s.js"),
+    "css": Bundle("chessground.css", "theme.css", "style.css", filters = "cssrewrite,rcssmin", output = "gen/packed.%(version)s.css"),
+    "app": Bundle("app.js", filters = "rjsmin", output = "gen/app.%(version)s.js")
+}
+for name, bundle in bundles.items():
+    assets.register(name, bundle)
 
 import fairy
+import archive
+import book
+import cluster
+
+openingBook = book.OpeningBook("book.bin") if os.path.exists("book.bin") else None
+gameArchive = archive.Archive("archive")
+
+log = logging.getLogger("notchess")
+
+def archiveGame(board):
+    # the board is no longer played on, so a worker thread can read it
+    # while the loop goes on serving the other rooms
+    if board.halfmove > 0:
+        gevent.get_hub().threadpool.spawn(gameArchive.add, board)
 
 def dataDictionary(board, msgtype = "position"):
+    entry = None
+    if openingBook is not None and board.halfmove < openingBook.plies:
+        entry = openingBook.lookup(board)
+    if entry is None:
+        entry = book.analyse(board)
     return {
         "fen": board.getFen(),
-        "dests": board.generateMoveDict(),
-        "check": board.isCheck(board.activeColor.opp()),
-        "result": board.result(),
+        "dests": entry["dests"],
+        "check": entry["check"],
+        "result": entry["result"],
         "names": {"white": board.whiteArmy, "black": board.blackArmy}
     }
 
-class ChessApplication(WebSocketApplication):
-    board = fairy.Board.fromArmy()
-    nPlayers = {
-        fairy.Color.white: 0,
-        fairy.Color.black: 0
-    }
+class Outbox:
+    maxsize = 64
+    maxlag = 10
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.queue = collections.deque()
+        self.ready = Event()
+        # when the outbox last stopped being empty: coalescing keeps the
+        # queue short for a stalled client, so its age says nothing
+        self.since = None
+        self.closed = False
+        self.greenlet = gevent.spawn(self.run)
+
+    def lag(self):
+        return 0 if self.since is None else fairy.timer() - self.since
+
+    def put(self, text, position = False):
+        if self.closed:
+            return
+        now = fairy.timer()
+        if self.lag() > Outbox.maxlag:
+            self.close()
+            return
+        if self.since is None:
+            self.since = now
+        if position:
+            # only the latest position matters, drop the ones it supersedes
+            self.queue = collections.deque(m for m in self.queue if not m[1])
+        self.queue.append((text, position, now))
+        if len(self.queue) > Outbox.maxsize:
+            self.queue.popleft()
+        self.ready.set()
+
+    def ping(self):
+        if self.closed:
+            return
+        if self.since is None:
+            self.since = fairy.timer()
+        self.queue.append((None, False, fairy.timer()))
+        self.ready.set()
+
+    def run(self):
+        try:
+            while True:
+                self.ready.wait()
+                while self.queue:
+                    text = self.queue.popleft()[0]
+                    if text is None:
+                        self.ws.send_frame(b"", self.ws.OPCODE_PING)
+                    else:
+                        self.ws.send(text)
+                self.since = None
+                self.ready.clear()
+        except (WebSocketError, OSError):
+            pass
+
+    def close(self):
+        # once only: every broadcast to a lagging client would otherwise
+        # spawn another shutdown
+        if self.closed:
+            return
+        self.stop()
+        gevent.spawn(self.shutdown)
+
+    def shutdown(self):
+        # the close frame may never get through to a client that stopped
+        # reading, so the socket is shut down after a grace period
+        with gevent.Timeout(Outbox.maxlag, False):
+            self.ws.close()
+            return
+        try:
+            self.ws.handler.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
 
+    def stop(self):
+        self.closed = True
+        self.queue.clear()
+        self.greenlet.kill(block = False)
+
+class TimerWheel:
+    # One greenlet for all connections. Entries are checked when their slot
+    # comes round and reschedule themselves, nothing is cancelled.
+    slots = 64
+
+    def __init__(self, tick, callback):
+        self.tick = tick
+        self.callback = callback
+        self.wheel = [set() for _ in range(TimerWheel.slots)]
+        self.position = 0
+        self.greenlet = gevent.spawn(self.run)
+
+    def schedule(self, item, delay):
+        ticks = min(max(int(delay / self.tick), 1), TimerWheel.slots - 1)
+        self.wheel[(self.position + ticks) % TimerWheel.slots].add(item)
+
+    def run(self):
+        while True:
+            gevent.sleep(self.tick)
+            self.position = (self.position + 1) % TimerWheel.slots
+            due = self.wheel[self.position]
+            self.wheel[self.position] = set()
+            for item in due:
+                self.callback(item)
+            logBuffer.flush()
+
+class LogBuffer(logging.Handler):
+    # formatted lines are collected and written from the hub's thread pool
+    # once per tick, so logging never blocks the event loop
+    maxsize = 10000
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.lines = []
+        self.dropped = 0
+
+    def emit(self, record):
+        if len(self.lines) < LogBuffer.maxsize:
+            self.lines.append(self.format(record))
+        else:
+            self.dropped += 1
+
+    def flush(self):
+        if self.dropped:
+            self.lines.append("level=WARNING event=log_dropped n=%d" % self.dropped)
+            self.dropped = 0
+        if self.lines:
+            lines, self.lines = self.lines, []
+            gevent.get_hub().threadpool.spawn(self.write, lines)
+
+    def write(self, lines):
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+logBuffer = LogBuffer(sys.stderr)
+logBuffer.setFormatter(logging.Formatter("time=%(asctime)s level=%(levelname)s pid=%(process)d %(message)s"))
+
+def priority(move):
+    return (not move.capture, abs(2 * move.dest.f - 7) + abs(2 * move.dest.r - 7))
+
+class Speculation:
+    maxsize = 256
+    allMoves = 16
+    # Analyses run one at a time across all rooms of the worker, each
+    # followed by a pause while still holding the lock: a move never waits
+    # behind more than one of them and speculation takes at most `share`
+    # of the worker's time.
+    share = 0.5
+    lock = BoundedSemaphore(1)
+
+    def __init__(self):
+        self.cache = collections.OrderedDict()
+        self.greenlet = None
+
+    def key(self, board, orig, dest):
+        # the analysis of a reply depends only on the position, not on the
+        # clocks or the history, so it survives undo and transpositions
+        return (board.whiteArmy, board.blackArmy, board.positionKey(), orig, dest)
+
+    def start(self, board):
+        self.stop()
+        self.greenlet = gevent.spawn(self.run, board)
+
+    def stop(self):
+        if self.greenlet is not None:
+            self.greenlet.kill(block = False)
+            self.greenlet = None
+
+    def run(self, board):
+        # analyse the replies while the player thinks, yielding to the
+        # websocket handlers between moves
+        position = board.positionKey()
+        moves = list(board.legalMoves().items())
+        if len(moves) > Speculation.allMoves:
+            moves.sort(key = lambda item: priority(item[1]))
+        for (orig, dest), move in moves:
+            gevent.sleep(0)
+            with Speculation.lock:
+                key = self.key(board, orig, dest)
+                if board.positionKey() != position:
+                    return
+                if key in self.cache:
+                    continue
+                start = fairy.timer()
+                self.cache[key] = dataDictionary(board.after(move))
+                while len(self.cache) > Speculation.maxsize:
+                    self.cache.popitem(last = False)
+                gevent.sleep((fairy.timer() - start) * (1 / Speculation.share - 1))
+
+    def pop(self, key, board):
+        data = self.cache.pop(key, None)
+        if data is not None:
+            data["fen"] = board.getFen()
+        return data
+
+class Room:
+    rooms = {}
+    grace = 60
+
+    def __init__(self, name):
+        self.name = name
+        self.board = fairy.Board.fromArmy()
+        self.clients = set()
+        self.nPlayers = {
+            fairy.Color.white: 0,
+            fairy.Color.black: 0
+        }
+        self.speculation = Speculation()
+        self.speculation.start(self.board)
+
+    @classmethod
+    def get(cls, name):
+        if name not in cls.rooms:
+            cls.rooms[name] = cls(name)
+        return cls.rooms[name]
+
+    def release(self):
+        # any path opens a room, so empty ones must not stay behind; the
+        # grace period lets a player reload the page without losing the game
+        if not self.clients:
+            gevent.spawn_later(Room.grace, self.close)
+
+    def close(self):
+        if self.clients or Room.rooms.get(self.name) is not self:
+            return
+        self.speculation.stop()
+        self.speculation.cache.clear()
+        archiveGame(self.board)
+        del Room.rooms[self.name]
+
+    def publish(self):
+        ChessApplication.lobby.publish("rooms", self.name, {
+            "pid": os.getpid(),
+            "clients": len(self.clients),
+            "white": self.board.whiteArmy,
+            "black": self.board.blackArmy
+        } if self.clients else None)
+
+class ChessWebSocket(WebSocket):
+    # same layout as WebSocket, so the handler can swap the class in place
+    __slots__ = ()
+
+    def handle_pong(self, header, payload):
+        # browsers answer pings on their own, the application never sees it
+        self.handler.active_client.lastSeen = fairy.timer()
+
+class ChessHandler(WebSocketHandler):
+    def run_websocket(self):
+        self.websocket.__class__ = ChessWebSocket
+        super().run_websocket()
+
+class ChessApplication(WebSocketApplication):
+    kriegspiel = False
+    lobby = cluster.Lobby()
+    wheel = None
+    pingInterval = 20
+    idleTimeout = 60
 
     def __init__(self, ws):
         super().__init__(ws)
 
+    @property
+    def room(self):
+        return self.ws.handler.active_client.room
+
+    @property
+    def board(self):
+        return self.room.board
+
     def on_open(self):
         client = self.ws.handler.active_client
+        client.room = Room.get(cluster.roomName(self.ws.environ["PATH_INFO"]))
 
-        nw = ChessApplication.nPlayers[fairy.Color.white]
-        nb = ChessApplication.nPlayers[fairy.Color.black]
+        nw = client.room.nPlayers[fairy.Color.white]
+        nb = client.room.nPlayers[fairy.Color.black]
 
         color = fairy.Color.white if nw <= nb else fairy.Color.black
         client.color = color
-        ChessApplication.nPlayers[color] += 1
+        client.room.nPlayers[color] += 1
 
         client.army = "Fabulous Fides"
         client.wantsNewGame = False
+        client.outbox = Outbox(self.ws)
+        client.lastSeen = fairy.timer()
+        client.closed = False
+        ChessApplication.wheel.schedule(client, ChessApplication.pingInterval)
+        client.room.clients.add(client)
+        client.room.publish()
 
-        print(color.name + " connected")
+        log.info("event=connect room=%s color=%s", client.room.name, color.name)
+
+    @staticmethod
+    def checkIdle(client):
+        if client.closed:
+            return
+        idle = fairy.timer() - client.lastSeen
+        if client.outbox.lag() > Outbox.maxlag:
+            # a client that stopped reading is dropped even if it still sends
+            log.info("event=lagging room=%s color=%s", client.room.name, client.color.name)
+            client.outbox.close()
+        elif idle >= ChessApplication.idleTimeout:
+            log.info("event=idle room=%s color=%s", client.room.name, client.color.name)
+            client.outbox.close()
+        elif idle >= ChessApplication.pingInterval:
+            client.outbox.ping()
+            ChessApplication.wheel.schedule(client, ChessApplication.pingInterval)
+        else:
+            ChessApplication.wheel.schedule(client, ChessApplication.pingInterval - idle)
 
     def on_message(self, message):
         client = self.ws.handler.active_client
         if message is None:
             return
-        message = json.loads(message)
-        if message["msg_type"] == "hi":
+        client.lastSeen = fairy.timer()
+        try:
+            message = json.loads(message)
+            handler = ChessApplication.handlers.get(message["msg_type"])
+        except (ValueError, TypeError, KeyError):
+            handler = None
+        if handler is None:
+            log.debug("event=rejected room=%s", client.room.name)
             return
-        print(message["msg_type"])
-        if message["msg_type"] == "move":
-            if self.board[fairy.Square(message["orig"])].color == self.board.activeColor:
-                start = fairy.timer()
-                move = self.board.makeMove(message["orig"], message["dest"])
-                self.broadcast_move(move)
-                print(move, fairy.timer() - start)
-        elif message["msg_type"] == "update_position":
-            self.update_position(client)
-        elif message["msg_type"] == "undo":
-            ChessApplication.board.undo(message["n"])
+        handler(self, client, message)
+
+    def handle_move(self, client, message):
+        start = fairy.timer()
+        orig, dest = message.get("orig"), message.get("dest")
+        speculation = self.room.speculation
+        key = speculation.key(self.board, orig, dest)
+        move = self.board.makeMove(orig, dest)
+        if move is None:
+            # the board only offers legal moves: a rejected one raced with
+            # the opponent's move, whose broadcast is already on its way
+            return
+        speculation.stop()
+        self.broadcast_move(move, speculation.pop(key, self.board), client)
+        log.info("event=move room=%s move=%s ms=%.1f", client.room.name, move, 1000 * (fairy.timer() - start))
+
+    def handle_update_position(self, client, message):
+        self.update_position(client)
+
+    def handle_undo(self, client, message):
+        self.board.undo(message["n"])
+        self.broadcast_position(clearLast = True)
+
+    def handle_select_army(self, client, message):
+        client.army = message["army"]
+
+    def handle_rooms(self, client, message):
+        self.broadcast({"msg_type": "rooms", "rooms": ChessApplication.lobby.get("rooms")}, client)
+
+    def handle_newgame(self, client, message):
+        client.wantsNewGame = True
+        if all([c.wantsNewGame for c in self.clients()]):
+            self.flipBoard()
+            self.room.speculation.stop()
+            archiveGame(self.board)
+            armies = {"white": self.board.whiteArmy, "black": self.board.blackArmy}
+            for c in self.clients():
+                armies[c.color.name] = c.army
+            self.room.board = fairy.Board.fromArmy(armies["white"], armies["black"])
+            self.room.publish()
+            self.broadcast({"msg_type": "newgame"})
             self.broadcast_position(clearLast = True)
-        elif message["msg_type"] == "select_army":
-            client.army = message["army"]
-        elif message["msg_type"] == "newgame":
-            client.wantsNewGame = True
-            if all([c.wantsNewGame for c in self.clients()]):
-                self.flipBoard()
-                armies = {"white": ChessApplication.board.whiteArmy, "black": ChessApplication.board.blackArmy}
-                for c in self.clients():
-                    armies[c.color.name] = c.army
-                ChessApplication.board = fairy.Board.fromArmy(armies["white"], armies["black"])
-                self.broadcast({"msg_type": "newgame"})
-                self.broadcast_position(clearLast = True)
-                for c in self.clients():
-                    c.wantsNewGame = False
-        else:
-            self.broadcast(message)
+            for c in self.clients():
+                c.wantsNewGame = False
+            log.info("event=newgame room=%s white=%r black=%r", client.room.name, armies["white"], armies["black"])
+
+    def handle_draw(self, client, message):
+        self.broadcast({"msg_type": "draw", "shapes": message.get("shapes", [])})
+
+    def handle_hi(self, client, message):
+        # heartbeat of clients from before protocol level pings
+        pass
 
     def flipBoard(self):
         for client in self.clients():
             client.color = client.color.opp()
 
-    def broadcast_move(self, move):
-        data = dataDictionary(ChessApplication.board)
+    def view(self, client, data):
+        if ChessApplication.kriegspiel:
+            # the side not to move must not see the opponent's moves either
+            dests = data["dests"] if client.color == self.board.activeColor else {}
+            return {**data, "fen": self.board.kriegspielFen(client.color), "dests": dests}
+        return data
+
+    def broadcast_move(self, move, data = None, mover = None):
+        if data is None:
+            data = dataDictionary(self.board)
         for client in self.clients():
-            client.ws.send(json.dumps({
-                "msg_type": "move",
-                "orig": str(move.orig),
-                "dest": str(move.dest),
+            if ChessApplication.kriegspiel and client is not mover:
+                # in the fog only the player who moved learns the squares
+                message = {"msg_type": "position", "clearLast": True}
+            else:
+                message = {"msg_type": "move", "orig": str(move.orig), "dest": str(move.dest)}
+            client.outbox.put(json.dumps({
+                **message,
                 "yourColor": client.color.name,
-                **data,
-                # "fen": ChessApplication.board.kriegspielFen(client.color)
-            }))
+                **self.view(client, data)
+            }), position = True)
+        self.room.speculation.start(self.board)
 
     def update_position(self, client):
-        data = dataDictionary(ChessApplication.board)
-        client.ws.send(json.dumps({
+        data = dataDictionary(self.board)
+        client.outbox.put(json.dumps({
             "msg_type": "position",
             "yourColor": client.color.name,
-            **data,
-            # "fen": ChessApplication.board.kriegspielFen(client.color)
-        }))
-        client.ws.send(json.dumps({
+            **self.view(client, data)
+        }), position = True)
+        client.outbox.put(json.dumps({
             "msg_type": "armies",
             "armies": list(fairy.armies.keys())
         }))
@@ -124,38 +495,113 @@ class ChessApplication(WebSocketApplication):
             clients = [clients]
         j = json.dumps(data)
         for client in clients:
-            client.ws.send(j)
+            client.outbox.put(j)
 
 
     def broadcast_position(self, clearLast = False):
-        data = dataDictionary(ChessApplication.board)
+        data = dataDictionary(self.board)
         for client in self.clients():
-            client.ws.send(json.dumps({
+            client.outbox.put(json.dumps({
             "msg_type": "position",
             "yourColor": client.color.name,
             "clearLast": clearLast,
-            **data,
-            # "fen": ChessApplication.board.kriegspielFen(client.color)
-        }))
+            **self.view(client, data)
+        }), position = True)
+        self.room.speculation.start(self.board)
 
     def on_close(self, reason):
-        print(self.ws.handler.active_client.color.name + " disconnected")
-        ChessApplication.nPlayers[self.ws.handler.active_client.color] -= 1
+        client = self.ws.handler.active_client
+        log.info("event=disconnect room=%s color=%s", client.room.name, client.color.name)
+        client.closed = True
+        client.outbox.stop()
+        client.room.nPlayers[client.color] -= 1
+        client.room.clients.discard(client)
+        client.room.publish()
+        client.room.release()
 
     def clients(self):
-        return self.ws.handler.server.clients.values()
+        return self.room.clients
+
+ChessApplication.handlers = {
+    "move": ChessApplication.handle_move,
+    "update_position": ChessApplication.handle_update_position,
+    "undo": ChessApplication.handle_undo,
+    "select_army": ChessApplication.handle_select_army,
+    "rooms": ChessApplication.handle_rooms,
+    "newgame": ChessApplication.handle_newgame,
+    "draw": ChessApplication.handle_draw,
+    "hi": ChessApplication.handle_hi
+}
 
 @flask_app.route('/')
 def index():
     return render_template('index.html')
 
-WebSocketServer(
-    ('localhost', 8000),
+@flask_app.route('/static/gen/<path:filename>')
+def bundle(filename):
+    directory = os.path.join(flask_app.static_folder, "gen")
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "") and os.path.exists(os.path.join(directory, filename + ".gz"))
+    response = send_from_directory(directory, filename + ".gz" if gzipped else filename,
+                                   mimetype = mimetypes.guess_type(filename)[0], max_age = 365 * 24 * 3600)
+    if gzipped:
+        response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
-    Resource([
+def buildAssets():
+    directory = os.path.join(flask_app.static_folder, "gen")
+    os.makedirs(directory, exist_ok = True)
+    for bundle in bundles.values():
+        bundle.build(force = True)
+    for name in os.listdir(directory):
+        if name.endswith((".js", ".css")):
+            with open(os.path.join(directory, name), "rb") as f, gzip.open(os.path.join(directory, name + ".gz"), "wb", 9) as gz:
+                gz.write(f.read())
+
+def application(lobby, production = False, kriegspiel = False):
+    ChessApplication.lobby = lobby
+    ChessApplication.kriegspiel = kriegspiel
+    ChessApplication.wheel = TimerWheel(1, ChessApplication.checkIdle)
+    log.addHandler(logBuffer)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    if production:
+        flask_app.debug = False
+        assets.debug = False
+        assets.auto_build = False
+    return Resource([
         ('^/websocket', ChessApplication),
-        ('^/.*', DebuggedApplication(flask_app))
-    ]),
+        ('^/.*', flask_app if production else DebuggedApplication(flask_app))
+    ])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default = "localhost")
+    parser.add_argument("--port", type = int, default = 8000)
+    parser.add_argument("--workers", type = int, default = 0, help = "number of worker processes, 0 serves from this process")
+    parser.add_argument("--production", action = "store_true", help = "serve prebuilt bundles without the debugger")
+    parser.add_argument("--kriegspiel", action = "store_true", help = "players only see their own pieces and the squares they attack")
+    parser.add_argument("--build-assets", action = "store_true", help = "build minified, gzipped bundles and exit")
+    args = parser.parse_args()
+
+    if args.build_assets:
+        with flask_app.app_context():
+            assets.debug = False
+            buildAssets()
+        return
+
+    factory = functools.partial(application, production = args.production, kriegspiel = args.kriegspiel)
+    if args.workers > 0:
+        cluster.supervise((args.host, args.port), args.workers, factory, handler_class = ChessHandler)
+    else:
+        WebSocketServer(
+            (args.host, args.port),
+            factory(cluster.Lobby()),
+            handler_class=ChessHandler,
+            debug=False
+        ).serve_forever()
 
-    debug=False
-).serve_forever()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -26,17 +26,12 @@ const ground = Chessground(document.getElementById("ground1"), {
     }
 });
 
-var ws = new WebSocket("ws://" + window.location.hostname + "/websocket");
+var ws = new WebSocket("ws://" + window.location.hostname + "/websocket/" + window.location.hash.slice(1));
 
 ws.onopen = function() {
     ws.send(JSON.stringify({
         msg_type: 'update_position'
     }));
-    window.setInterval(function() {
-        ws.send(JSON.stringify({
-            msg_type: "hi"
-        }))
-    }, 5000);
 };
 
 ws.onmessage = function(event) {
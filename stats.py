@@ -0,0 +1,107 @@
+import argparse
+import collections
+import csv
+import itertools
+import multiprocessing
+import random
+
+import fairy
+
+emptyFen = "8/8/8/8/8/8/8/8 w - - 0 1"
+
+def emptyBoardMobility(army):
+    pieces = fairy.generateArmy(army, fairy.Color.white)
+    board = fairy.Board(emptyFen, pieces = pieces)
+    mobility = {}
+    for name, piece in pieces.items():
+        if piece.isempty():
+            continue
+        total = 0
+        for square in board.squares():
+            board[square] = piece
+            total += sum(1 for _ in piece.generateMoves(square, board))
+            board[square] = fairy.Piece.empty()
+        mobility[name] = total / 64
+    return mobility
+
+def sample(job):
+    white, black, npositions, plies, seed = job
+    rng = random.Random(seed)
+    totals = collections.Counter()
+    pieces = collections.Counter()
+    while totals["positions"] < npositions:
+        # every position of a random playout is one sample
+        board = fairy.Board.fromArmy(white, black)
+        for _ in range(plies):
+            legal = list(board.legalMoves())
+            color = board.activeColor
+            totals["positions"] += 1
+            totals["mobility"] += len(legal)
+            totals["mobility2"] += len(legal) * len(legal)
+            # squares the side to move reaches or captures on, and the enemy
+            # pieces among them; a pawn's empty diagonals are not reached
+            reached = set()
+            for move in board.generatePseudolegalMoves(color):
+                reached.add(str(move.dest))
+                reached.update(str(square) for square in move.captures())
+            totals["reach"] += len(reached)
+            totals["attacked"] += len(board.attackMap(color))
+            totals["checks"] += board.isCheck(color.opp())
+            for square, piece in board:
+                if piece.color == color:
+                    key = (white if color == fairy.Color.white else black, piece.name.upper())
+                    pieces[key + ("moves",)] += len(board.pieceMoves(square))
+                    pieces[key + ("count",)] += 1
+            if not legal or totals["positions"] >= npositions:
+                break
+            board.makeMove(*rng.choice(legal))
+    return (white, black), totals, pieces
+
+def run(args):
+    jobs = []
+    for white, black in itertools.product(args.armies, repeat = 2):
+        for i in range(0, args.positions, args.chunksize):
+            jobs.append((white, black, min(args.chunksize, args.positions - i), args.plies, "%d/%s/%s/%d" % (args.seed, white, black, i)))
+
+    pairs = collections.defaultdict(collections.Counter)
+    pieces = collections.Counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for pair, totals, counts in pool.imap_unordered(sample, jobs):
+            pairs[pair].update(totals)
+            pieces.update(counts)
+
+    with open(args.output + ".pairs.csv", "w", newline = "") as f:
+        writer = csv.writer(f)
+        writer.writerow(["white", "black", "positions", "mobility", "mobility_sd", "reachable_squares", "reach_density", "attacked_pieces", "check_rate"])
+        for (white, black), t in sorted(pairs.items()):
+            n = t["positions"]
+            mean = t["mobility"] / n
+            writer.writerow([white, black, n, round(mean, 3), round(max(t["mobility2"] / n - mean * mean, 0) ** 0.5, 3),
+                             round(t["reach"] / n, 3), round(t["reach"] / n / 64, 4),
+                             round(t["attacked"] / n, 3), round(t["checks"] / n, 4)])
+
+    knight = emptyBoardMobility("Fabulous Fides")["N"]
+    with open(args.output + ".pieces.csv", "w", newline = "") as f:
+        writer = csv.writer(f)
+        writer.writerow(["army", "piece", "empty_mobility", "game_mobility", "value"])
+        for army in args.armies:
+            for name, mobility in emptyBoardMobility(army).items():
+                count = pieces[(army, name, "count")]
+                writer.writerow([army, name, round(mobility, 3),
+                                 round(pieces[(army, name, "moves")] / count, 3) if count else "",
+                                 # knight = 3 on the empty board scale
+                                 round(3 * mobility / knight, 2) if name != "K" else ""])
+
+def main():
+    parser = argparse.ArgumentParser(description = "Sample random positions per army pair and write balance statistics.")
+    parser.add_argument("output", help = "prefix for <output>.pairs.csv and <output>.pieces.csv")
+    parser.add_argument("--armies", nargs = "*", default = list(fairy.armies.keys()))
+    parser.add_argument("--positions", type = int, default = 1000, help = "positions per army pair")
+    parser.add_argument("--plies", type = int, default = 60, help = "maximum length of a random playout")
+    parser.add_argument("--chunksize", type = int, default = 100)
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--seed", type = int, default = 0)
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+import argparse
+import array
+import collections
+import heapq
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import struct
+from copy import deepcopy
+
+import fairy
+
+# Values are stored per position as uint16: 0 is a draw, INVALID marks
+# positions that cannot occur, anything else is distance to mate in plies
+# plus one. Odd distances are wins for the side to move, even ones losses.
+MAGIC = b"NCTB0002"
+header = struct.Struct("<8sI")
+spoolRecord = struct.Struct("<iHB")
+DRAW = 0
+INVALID = 0xFFFF
+
+emptyFen = "8/8/8/8/8/8/8/8 w - - 0 1"
+
+def canonical(material):
+    return "".join(sorted(material, key = lambda n: fairy.pieceOrder.index(n.upper())))
+
+def filename(white, black, whiteMaterial, blackMaterial):
+    return "_".join([white, black, whiteMaterial, blackMaterial]).replace(" ", "-") + ".tb"
+
+def decode(value):
+    if value == DRAW:
+        return 0, None
+    dtm = value - 1
+    return (1 if dtm % 2 == 1 else -1), dtm
+
+def reductions(whiteMaterial, blackMaterial):
+    for material, isWhite in [(whiteMaterial, True), (blackMaterial, False)]:
+        for name in set(material.upper()) - {"K"}:
+            smaller = material.replace(name if isWhite else name.lower(), "", 1)
+            yield (smaller, blackMaterial) if isWhite else (whiteMaterial, smaller)
+
+
+def rankCombination(positions):
+    # colex rank of a sorted k-subset of range(n)
+    return sum(math.comb(p, i + 1) for i, p in enumerate(positions))
+
+def unrankCombination(rank, k, n):
+    positions = []
+    for i in range(k, 0, -1):
+        p = n - 1
+        while math.comb(p, i) > rank:
+            p -= 1
+        positions.append(p)
+        rank -= math.comb(p, i)
+        n = p
+    return list(reversed(positions))
+
+
+class Material:
+    # Identical pieces are placed together as a combination of the squares
+    # the earlier groups left free, so every index is a distinct legal
+    # placement: no overlapping pieces, no permutations of equal pieces.
+    def __init__(self, white, black, whiteMaterial, blackMaterial):
+        whiteMaterial = canonical(whiteMaterial.upper())
+        blackMaterial = canonical(blackMaterial.lower())
+        if "P" in whiteMaterial.upper() + blackMaterial.upper():
+            raise ValueError("pawns are not supported in tablebases")
+        if whiteMaterial.count("K") != 1 or blackMaterial.count("k") != 1:
+            raise ValueError("each side needs exactly one king")
+        self.white = white
+        self.black = black
+        self.whiteMaterial = whiteMaterial
+        self.blackMaterial = blackMaterial
+        self.slots = list(whiteMaterial + blackMaterial)
+        self.counts = collections.Counter(self.slots)
+        self.groups = list(self.counts.items())
+        self.radices = []
+        free = 64
+        for _, count in self.groups:
+            self.radices.append(math.comb(free, count))
+            free -= count
+        self.size = 2 * math.prod(self.radices)
+
+    def key(self):
+        return (self.white, self.black, self.whiteMaterial, self.blackMaterial)
+
+    def filename(self):
+        return filename(*self.key())
+
+    def index(self, board):
+        squares = collections.defaultdict(list)
+        for square, piece in board:
+            if not piece.isempty():
+                squares[str(piece)].append(square.r * 8 + square.f)
+        if {name: len(s) for name, s in squares.items()} != self.counts:
+            return None
+        free = list(range(64))
+        index = 0
+        for (name, _), radix in zip(self.groups, self.radices):
+            placed = sorted(squares[name])
+            index = index * radix + rankCombination([free.index(square) for square in placed])
+            for square in placed:
+                free.remove(square)
+        return index * 2 + (board.activeColor == fairy.Color.black)
+
+    def squares(self, index):
+        index //= 2
+        ranks = []
+        for radix in reversed(self.radices):
+            ranks.append(index % radix)
+            index //= radix
+        free = list(range(64))
+        squares = []
+        for (_, count), rank in zip(self.groups, reversed(ranks)):
+            placed = [free[p] for p in unrankCombination(rank, count, len(free))]
+            squares += placed
+            for square in placed:
+                free.remove(square)
+        return squares
+
+
+class Tablebase:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, length = header.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(path + " is not a tablebase")
+        meta = json.loads(self.data[header.size:header.size + length])
+        self.material = Material(*meta["material"])
+        start = header.size + length
+        self.values = memoryview(self.data)[start:start + 2 * self.material.size].cast("H")
+
+    def value(self, board):
+        index = self.material.index(board)
+        return INVALID if index is None else self.values[index]
+
+    def probe(self, board):
+        value = self.value(board)
+        if value == INVALID:
+            return None
+        return decode(value)
+
+
+def load(directory):
+    for name in os.listdir(directory):
+        if name.endswith(".tb"):
+            table = Tablebase(os.path.join(directory, name))
+            fairy.Board.tablebases[table.material.key()] = table
+    return fairy.Board.tablebases
+
+def exitValue(board):
+    white, black = board.material()
+    if white == "K" and black == "k":
+        return DRAW
+    return fairy.Board.tablebases[(board.whiteArmy, board.blackArmy, white, black)].value(board)
+
+
+class Generator:
+    def __init__(self, material, directory):
+        self.material = material
+        load(directory)
+        self.pieces = {
+            **fairy.generateArmy(material.white, fairy.Color.white),
+            **fairy.generateArmy(material.black, fairy.Color.black)
+        }
+        self.board = fairy.Board(emptyFen, pieces = self.pieces)
+        self.board.whiteArmy = material.white
+        self.board.blackArmy = material.black
+        self.board.history = []
+        self.board.hashes = []
+
+    def setup(self, index):
+        squares = self.material.squares(index)
+        for square, name in zip(squares, self.material.slots):
+            piece = deepcopy(self.pieces[name])
+            piece.color = fairy.Color.white if name.isupper() else fairy.Color.black
+            # castling rights are not part of the index
+            piece.nmoves = 1
+            self.board[fairy.Square(square % 8, square // 8)] = piece
+        self.board.activeColor = fairy.Color.black if index % 2 else fairy.Color.white
+        return squares
+
+    def clear(self, squares):
+        for square in squares:
+            self.board[fairy.Square(square % 8, square // 8)] = fairy.Piece.empty()
+
+    def analyse(self, index):
+        squares = self.setup(index)
+        board = self.board
+        if board.isCheck(board.activeColor):
+            self.clear(squares)
+            return None
+        successors = []
+        exits = []
+        for move in board.generateMoves():
+            after = board.after(move)
+            successor = self.material.index(after)
+            if successor is None:
+                exits.append(exitValue(after))
+            else:
+                successors.append(successor)
+        inCheck = board.isCheck(board.activeColor.opp())
+        self.clear(squares)
+        return successors, exits, inCheck
+
+
+generator = None
+
+def initWorker(material, directory):
+    global generator
+    generator = Generator(material, directory)
+
+def encode(position):
+    if position is None:
+        return spoolRecord.pack(-1, 0, 0)
+    successors, exits, inCheck = position
+    return (spoolRecord.pack(len(successors), len(exits), inCheck)
+            + array.array("I", successors).tobytes() + array.array("H", exits).tobytes())
+
+def analyseChunk(bounds):
+    return b"".join(encode(generator.analyse(i)) for i in range(*bounds))
+
+def readSpool(path):
+    with open(path, "rb") as f:
+        index = 0
+        while True:
+            head = f.read(spoolRecord.size)
+            if not head:
+                return
+            nsuccessors, nexits, inCheck = spoolRecord.unpack(head)
+            if nsuccessors < 0:
+                yield index, None
+            else:
+                successors = array.array("I")
+                successors.frombytes(f.read(4 * nsuccessors))
+                exits = array.array("H")
+                exits.frombytes(f.read(2 * nexits))
+                yield index, (successors, exits, bool(inCheck))
+            index += 1
+
+def retrograde(size, positions):
+    values = array.array("H", [DRAW]) * size
+    remaining = array.array("H", [0]) * size
+    maxWin = array.array("H", [0]) * size
+    canLose = bytearray([1]) * size
+    done = bytearray(size)
+    offsets = array.array("I", [0]) * (size + 1)
+    heap = []
+
+    # first pass: count predecessors and seed terminal and exit values
+    for index, position in positions():
+        if position is None:
+            values[index] = INVALID
+            done[index] = 1
+            continue
+        successors, exits, inCheck = position
+        for successor in successors:
+            offsets[successor + 1] += 1
+        remaining[index] = len(successors)
+        for value in exits:
+            if value == DRAW:
+                canLose[index] = 0
+            elif (value - 1) % 2 == 0:
+                canLose[index] = 0
+                heapq.heappush(heap, (value, index))
+            else:
+                maxWin[index] = max(maxWin[index], value)
+        if not successors and not exits:
+            if inCheck:
+                heapq.heappush(heap, (0, index))
+            else:
+                canLose[index] = 0
+        elif not successors and canLose[index]:
+            heapq.heappush(heap, (maxWin[index], index))
+
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    predecessors = array.array("I", [0]) * offsets[size]
+    fill = array.array("I", offsets[:size])
+    for index, position in positions():
+        if position is not None:
+            for successor in position[0]:
+                predecessors[fill[successor]] = index
+                fill[successor] += 1
+    del fill
+
+    while heap:
+        dtm, index = heapq.heappop(heap)
+        if done[index]:
+            continue
+        done[index] = 1
+        values[index] = dtm + 1
+        for i in range(offsets[index], offsets[index + 1]):
+            p = predecessors[i]
+            if done[p]:
+                continue
+            if dtm % 2 == 0:
+                canLose[p] = 0
+                heapq.heappush(heap, (dtm + 1, p))
+            else:
+                remaining[p] -= 1
+                maxWin[p] = max(maxWin[p], dtm + 1)
+                if remaining[p] == 0 and canLose[p]:
+                    heapq.heappush(heap, (maxWin[p], p))
+    return values
+
+def generate(white, black, whiteMaterial, blackMaterial, directory, workers = None, chunksize = 4096):
+    material = Material(white, black, whiteMaterial, blackMaterial)
+    path = os.path.join(directory, material.filename())
+    if os.path.exists(path):
+        return path
+    for w, b in reductions(material.whiteMaterial, material.blackMaterial):
+        if w != "K" or b != "k":
+            generate(white, black, w, b, directory, workers, chunksize)
+
+    # move lists are spooled to disk between the two passes of retrograde()
+    spool = path + ".moves"
+    chunks = [(start, min(start + chunksize, material.size)) for start in range(0, material.size, chunksize)]
+    with multiprocessing.Pool(workers, initWorker, (material, directory)) as pool, open(spool, "wb") as f:
+        for chunk in pool.imap(analyseChunk, chunks):
+            f.write(chunk)
+
+    values = retrograde(material.size, lambda: readSpool(spool))
+    os.remove(spool)
+
+    meta = json.dumps({"material": list(material.key())}).encode()
+    meta += b" " * (len(meta) % 2)
+    with open(path + ".tmp", "wb") as f:
+        f.write(header.pack(MAGIC, len(meta)))
+        f.write(meta)
+        f.write(values.tobytes())
+    os.replace(path + ".tmp", path)
+    print("wrote", path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description = "Generate endgame tablebases for fairy armies.")
+    parser.add_argument("white", help = "white army")
+    parser.add_argument("black", help = "black army")
+    parser.add_argument("material", help = "e.g. KQvK or KNvKR")
+    parser.add_argument("--directory", default = "tablebases")
+    parser.add_argument("--workers", type = int, default = None)
+    args = parser.parse_args()
+
+    whiteMaterial, blackMaterial = args.material.split("v")
+    os.makedirs(args.directory, exist_ok = True)
+    generate(args.white, args.black, whiteMaterial, blackMaterial, args.directory, args.workers)
+
+if __name__ == "__main__":
+    main()